@@ -4,12 +4,39 @@ import pandas as pd
 import re
 from io import BytesIO
 from datetime import datetime
+from functools import lru_cache
 
 
 # ─────────────────────────────────────────────
 # 1.  PRE-PROCESSOR
 # ─────────────────────────────────────────────
 
+_PHONE_PARENS_RE = re.compile(r'\(\+?91[-\s]?([6-9]\d{9})\)')
+_PHONE_PLUS91_RE = re.compile(r'\+91[-\s]?([6-9]\d{9})')
+_PHONE_KEYWORD_RE = re.compile(r'phone|mob|tel|call|contact', re.IGNORECASE)
+_PHONE_BARE91_RE = re.compile(r'\b91[-\s]?([6-9]\d{9})\b')
+_AMOUNT_SLASH_DASH_RE = re.compile(r'([\d,\.]+)\s*/\s*[-–—]')
+_AMOUNT_CURRENCY_RE = re.compile(r'(?:Rs\.?|₹|INR)\s*([\d,\.]+)')
+_AMOUNT_PARENS_RE = re.compile(r'\(([\d,\.]+)\)')
+_DATE_SPACED_RE = re.compile(
+    r'\b(\d{1,2})\s*([/\-.])\s*([A-Za-z]{3,9}|\d{1,2})\s*([/\-.])\s*(\d{2,4})\b'
+)
+_ACCOUNT_KEYWORD_RE = re.compile(
+    r'account|a\s*/?\s*c|acc|beneficiary|pay\s+to|transfer', re.IGNORECASE
+)
+_SPACED_DIGITS_RE = re.compile(r'\d[\d\s\-\.]{8,25}\d')
+_DIGIT_SEPARATORS_RE = re.compile(r'[\s\-\.]')
+_NUMERIC_DATE_RE = re.compile(r'\d{1,2}[./\-]\d{1,2}[./\-]\d{2,4}')
+_DIGITS_AND_SEPARATORS_RE = re.compile(r'^[\d\s\-\.]+$')
+
+
+def _collapse_account_digits(m):
+    digits = _DIGIT_SEPARATORS_RE.sub('', m.group(0))
+    if 9 <= len(digits) <= 18:
+        return digits
+    return m.group(0)
+
+
 def preprocess_text(text):
     """
     Normalise raw PDF text before tokenizing.  Fixes:
@@ -23,48 +50,39 @@ def preprocess_text(text):
     for line in lines:
         # ── Phone: parens + country code ──
         # (91-XXXXXXXXXX) or (+91-XXXXXXXXXX)
-        line = re.sub(r'\(\+?91[-\s]?([6-9]\d{9})\)', r'\1', line)
+        line = _PHONE_PARENS_RE.sub(r'\1', line)
         # +91 XXXXXXXXXX (no parens, with or without space)
-        line = re.sub(r'\+91[-\s]?([6-9]\d{9})', r'\1', line)
+        line = _PHONE_PLUS91_RE.sub(r'\1', line)
         # 91-XXXXXXXXXX bare, only near phone keywords
-        if re.search(r'phone|mob|tel|call|contact', line, re.IGNORECASE):
-            line = re.sub(r'\b91[-\s]?([6-9]\d{9})\b', r'\1', line)
+        if _PHONE_KEYWORD_RE.search(line):
+            line = _PHONE_BARE91_RE.sub(r'\1', line)
 
         # ── Amount: strip trailing /- ──
-        line = re.sub(r'([\d,\.]+)\s*/\s*[-–—]', r'\1', line)
+        line = _AMOUNT_SLASH_DASH_RE.sub(r'\1', line)
 
         # ── Amount: strip Rs./₹/INR prefix glued to number ──
-        line = re.sub(r'(?:Rs\.?|₹|INR)\s*([\d,\.]+)', r'\1', line)
+        line = _AMOUNT_CURRENCY_RE.sub(r'\1', line)
 
         # ── Amount: strip surrounding parentheses ──
-        line = re.sub(r'\(([\d,\.]+)\)', r'\1', line)
+        line = _AMOUNT_PARENS_RE.sub(r'\1', line)
 
         # ── Date: collapse spaces around separators ──
         # "28 / 11 / 2025" → "28/11/2025"   "28 - Nov - 25" → "28-Nov-25"
-        line = re.sub(
-            r'\b(\d{1,2})\s*([/\-.])\s*([A-Za-z]{3,9}|\d{1,2})\s*([/\-.])\s*(\d{2,4})\b',
-            lambda m: m.group(1) + m.group(2) + m.group(3) + m.group(4) + m.group(5),
-            line
-        )
+        line = _DATE_SPACED_RE.sub(r'\1\2\3\4\5', line)
 
         # ── Account: collapse spaces / dashes / dots into pure digits ──
         # Fires on label lines AND on any line where a spaced-out digit group
         # looks like a bank account (total 9-18 digits with internal separators)
-        if re.search(r'account|a\s*/?\s*c|acc|beneficiary|pay\s+to|transfer', line, re.IGNORECASE):
-            def collapse_digits(m):
-                digits = re.sub(r'[\s\-\.]', '', m.group(0))
-                if 9 <= len(digits) <= 18:
-                    return digits
-                return m.group(0)
-            line = re.sub(r'\d[\d\s\-\.]{8,25}\d', collapse_digits, line)
+        if _ACCOUNT_KEYWORD_RE.search(line):
+            line = _SPACED_DIGITS_RE.sub(_collapse_account_digits, line)
         else:
             # Even without a label keyword, collapse if it's a standalone spaced number
             # that totals 9-18 digits (e.g. "4500 1011 0017 123" on its own line).
             # GUARD: never collapse if the line contains a date pattern (DD.MM.YYYY etc.)
             stripped = line.strip()
-            has_date = re.search(r'\d{1,2}[./\-]\d{1,2}[./\-]\d{2,4}', stripped)
-            if not has_date and re.match(r'^[\d\s\-\.]+$', stripped):
-                digits_only = re.sub(r'[\s\-\.]', '', stripped)
+            has_date = _NUMERIC_DATE_RE.search(stripped)
+            if not has_date and _DIGITS_AND_SEPARATORS_RE.match(stripped):
+                digits_only = _DIGIT_SEPARATORS_RE.sub('', stripped)
                 if 9 <= len(digits_only) <= 18 and digits_only.isdigit():
                     line = digits_only
 
@@ -77,15 +95,38 @@ def preprocess_text(text):
 # 2.  TOKENIZER
 # ─────────────────────────────────────────────
 
+_GLUED_PHONE_RE = re.compile(r'^\(\+?(?:91[-\s]?)?([6-9]\d{9})\)$')
+_GLUED_DATE_RE = re.compile(r'^\d{1,2}[-–—][A-Za-z]{3,9}[-–—]\d{2,4}$')
+_GLUED_PHASE_RE = re.compile(r'^PHASE[-–—][IVX]+$', re.IGNORECASE)
+_HYPHENATED_WORD_RE = re.compile(r'^[A-Za-z]{2,8}[-][A-Za-z]{2,8}$')
+_GLUED_LABEL_VALUE_RE = re.compile(r'^(.*?[A-Za-z.])[-–—:]+([A-Za-z0-9].*)$')
+_GLUED_TRAILING_SEP_RE = re.compile(r'^(.*?[A-Za-z.])[-–—:]+$')
+_WHITESPACE_SPLIT_RE = re.compile(r'(\s+)')
+
+# Left halves that mark a hyphenated token as label-value rather than an English word
+KNOWN_LABELS = frozenset({
+    'no', 'code', 'ifsc', 'pan', 'gst', 'tin', 'acc', 'name',
+    'bank', 'branch', 'date', 'invoice', 'bill', 'ref', 'amount',
+})
+
+
 class Token:
-    __slots__ = ("text", "pos", "line_idx", "line", "prev_tokens", "next_tokens")
-    def __init__(self, text, pos, line_idx, line, prev_tokens, next_tokens):
+    __slots__ = ("text", "line_idx", "line", "prev_tokens", "next_tokens",
+                 "prev_lower", "next_lower", "line_words", "negative_line")
+    def __init__(self, text, line_idx, line, prev_tokens, next_tokens,
+                 prev_lower=(), next_lower=(), line_words=frozenset(), negative_line=False):
         self.text = text
-        self.pos = pos
         self.line_idx = line_idx
         self.line = line
         self.prev_tokens = prev_tokens
         self.next_tokens = next_tokens
+        # prev/next tokens lowercased with trailing periods stripped, for scoring
+        self.prev_lower = prev_lower
+        self.next_lower = next_lower
+        # Lowercased words of the line (trailing periods stripped), shared by its tokens
+        self.line_words = line_words
+        # Line holds a NEGATIVE_CONTEXT word, so only a phone number can score here
+        self.negative_line = negative_line
 
 
 def _split_glued(token_text):
@@ -104,33 +145,36 @@ def _split_glued(token_text):
       'IFSC:BKID0004500'    → ['IFSC', 'BKID0004500']
       'No:-06AAFCI1834E1ZX' → ['No', '06AAFCI1834E1ZX']
     """
+    # ── Fast path: every rule below needs a separator or a leading '(' ──
+    if (not token_text.startswith('(') and '-' not in token_text and ':' not in token_text
+            and '–' not in token_text and '—' not in token_text):
+        return [token_text]
+
     # ── Phone in parens: (+91-XXXXXXXXXX) / (91-XXXXXXXXXX) / (XXXXXXXXXX) ──
-    m = re.match(r'^\(\+?(?:91[-\s]?)?([6-9]\d{9})\)$', token_text)
+    m = _GLUED_PHONE_RE.match(token_text)
     if m:
         return [m.group(1)]
 
     # ── Guard: protect known unsplittable patterns ──
 
     # Date: DD-Mon-YY or DD-MonthName-YYYY (digits-letters-digits)
-    if re.match(r'^\d{1,2}[-–—][A-Za-z]{3,9}[-–—]\d{2,4}$', token_text):
+    if _GLUED_DATE_RE.match(token_text):
         return [token_text]
 
     # PHASE-III / PHASE-IV style
-    if re.match(r'^PHASE[-–—][IVX]+$', token_text, re.IGNORECASE):
+    if _GLUED_PHASE_RE.match(token_text):
         return [token_text]
 
     # Common hyphenated English words (short-short pattern, both sides alphabetic, neither side is a known label)
-    if re.match(r'^[A-Za-z]{2,8}[-][A-Za-z]{2,8}$', token_text):
+    if _HYPHENATED_WORD_RE.match(token_text):
         # Only protect if neither side looks like a known invoice label
         left = token_text.split('-')[0].lower()
-        known_labels = {'no', 'code', 'ifsc', 'pan', 'gst', 'tin', 'acc', 'name',
-                        'bank', 'branch', 'date', 'invoice', 'bill', 'ref', 'amount'}
-        if left not in known_labels:
+        if left not in KNOWN_LABELS:
             return [token_text]
 
     # ── Main split logic ──
     # Label ends with letter or period; value starts with letter or digit
-    m = re.match(r'^(.*?[A-Za-z.])[-–—:]+([A-Za-z0-9].*)$', token_text)
+    m = _GLUED_LABEL_VALUE_RE.match(token_text)
     if m:
         label = m.group(1).strip()
         value = m.group(2).strip()
@@ -142,7 +186,7 @@ def _split_glued(token_text):
         return parts if parts else [token_text]
 
     # Trailing separator only: 'Name-' or 'Code:'
-    m2 = re.match(r'^(.*?[A-Za-z.])[-–—:]+$', token_text)
+    m2 = _GLUED_TRAILING_SEP_RE.match(token_text)
     if m2:
         label = m2.group(1).strip()
         return [label] if label else [token_text]
@@ -153,32 +197,33 @@ def _split_glued(token_text):
 def tokenize(text, context_window=5):
     tokens = []
     lines = text.split("\n")
-    char_offset = 0
 
     for line_idx, line in enumerate(lines):
-        parts = re.split(r'(\s+)', line)
-        raw_tokens = [p for p in parts if p.strip()]
+        parts = _WHITESPACE_SPLIT_RE.split(line)
 
         # Expand glued tokens
         line_tokens_text = []
-        for t in raw_tokens:
-            line_tokens_text.extend(_split_glued(t))
+        for p in parts:
+            if p.strip():
+                line_tokens_text.extend(_split_glued(p))
 
-        for tok_idx, tok_text in enumerate(line_tokens_text):
-            pos = text.find(tok_text, char_offset)
-            if pos == -1:
-                pos = char_offset
+        if line_tokens_text:
+            line_words = frozenset(w.lower().rstrip('.') for w in line.split())
+            negative_line = not NEGATIVE_CONTEXT.isdisjoint(line_words)
+            line_lower = [t.lower().rstrip('.') for t in line_tokens_text]
 
-            prev = line_tokens_text[max(0, tok_idx - context_window):tok_idx]
-            nxt = line_tokens_text[tok_idx + 1:tok_idx + 1 + context_window]
+        for tok_idx, tok_text in enumerate(line_tokens_text):
+            prev_start = max(0, tok_idx - context_window)
+            next_end = tok_idx + 1 + context_window
 
             tokens.append(Token(
-                text=tok_text, pos=pos, line_idx=line_idx, line=line,
-                prev_tokens=prev, next_tokens=nxt
+                text=tok_text, line_idx=line_idx, line=line,
+                prev_tokens=line_tokens_text[prev_start:tok_idx],
+                next_tokens=line_tokens_text[tok_idx + 1:next_end],
+                prev_lower=line_lower[prev_start:tok_idx],
+                next_lower=line_lower[tok_idx + 1:next_end],
+                line_words=line_words, negative_line=negative_line
             ))
-            char_offset = pos + len(tok_text)
-
-        char_offset += len(line) + 1
 
     return tokens
 
@@ -236,8 +281,12 @@ ENTITY_DEFS = {
     },
     "DATE": {
         # DD-Mon-YY, DD/MM/YYYY, DD.MM.YYYY, YYYY-MM-DD
+        # Month names are spelled out so '12-XYZ-24' never scores as a date
         "format": re.compile(
-            r'^(\d{1,2}[-./]\s*([A-Za-z]{3,9}|\d{1,2})\s*[-./]\d{2,4}|\d{4}[-./]\d{1,2}[-./]\d{1,2})$'
+            r'^(\d{1,2}[-./]\s*('
+            r'(?ai:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?'
+            r'|aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)'
+            r'|\d{1,2})\s*[-./]\d{2,4}|\d{4}[-./]\d{1,2}[-./]\d{1,2})$'
         ),
         "context_keywords": {
             "date": 8, "dated": 9, "invoice": 4, "on": 2, "day": 3
@@ -274,51 +323,67 @@ NEGATIVE_CONTEXT = {
 # 5.  NLP SCORER
 # ─────────────────────────────────────────────
 
-def score_token_for_entity(token, entity_type):
-    edef = ENTITY_DEFS[entity_type]
-
-    # Strip trailing punctuation like periods from token before format check
-    clean = token.text.strip().rstrip('.')
-    # But keep the original for period-ending checks
-    raw = token.text.strip()
-
-    # Try both raw and cleaned against format
-    if not (edef["format"].match(raw) or edef["format"].match(clean)):
-        return 0  # Hard gate
-
-    score = 50  # Base for format match
+# (entity_type, format, ((keyword, weight), ...)) with keywords already
+# lowercased and stripped of trailing periods, so scoring never re-lowers them
+_ENTITY_LIST = tuple(
+    (entity_type, edef["format"],
+     tuple((kw.lower().rstrip('.'), w) for kw, w in edef["context_keywords"].items()))
+    for entity_type, edef in ENTITY_DEFS.items()
+)
+_ENTITY_KEYWORDS = {entity_type: keywords for entity_type, _, keywords in _ENTITY_LIST}
+_PHONE_FORMAT = ENTITY_DEFS["PHONE_NUMBER"]["format"]
+# Matches iff at least one entity format does; most tokens are plain words
+# and fail this single match instead of all eight
+_ANY_FORMAT_RE = re.compile('|'.join(
+    f'(?i:{fmt.pattern})' if fmt.flags & re.IGNORECASE else f'(?:{fmt.pattern})'
+    for _, fmt, _ in _ENTITY_LIST
+))
+
+
+def _token_context(token):
+    surrounding = set(token.prev_lower)
+    surrounding.update(token.next_lower)
+    line_words = token.line_words
+    return surrounding, line_words, line_words.union(surrounding)
+
+
+def _context_entities(fmt_hits, all_context):
+    """Entity types the token fits by format that also have real keyword support (> 5)."""
+    strong = []
+    for entity_type, _, keywords in _ENTITY_LIST:
+        if fmt_hits[entity_type]:
+            other_score = 0
+            for kw, w in keywords:
+                if kw in all_context:
+                    other_score += w
+            if other_score > 5:
+                strong.append(entity_type)
+    return strong
 
-    surrounding = [t.lower().rstrip('.') for t in token.prev_tokens + token.next_tokens]
-    line_words = [w.lower().rstrip('.') for w in token.line.split()]
-    all_context = set(surrounding + line_words)
 
+def _score_in_context(token, entity_type, strong_entities, clean, surrounding, line_words, all_context):
+    """Score a token whose text already matched entity_type's format."""
     # Negative context kills non-phone entities
     if all_context & NEGATIVE_CONTEXT and entity_type != "PHONE_NUMBER":
         return 0
 
+    score = 50  # Base for format match
+
     # Positive context
-    for keyword, weight in edef["context_keywords"].items():
-        kw = keyword.lower().rstrip('.')
+    for kw, weight in _ENTITY_KEYWORDS[entity_type]:
         if kw in surrounding:
             score += weight
-            if token.prev_tokens and token.prev_tokens[-1].lower().rstrip('.').startswith(kw):
+            if token.prev_lower and token.prev_lower[-1].startswith(kw):
                 score += 5
-            if token.next_tokens and token.next_tokens[0].lower().rstrip('.').startswith(kw):
+            if token.next_lower and token.next_lower[0].startswith(kw):
                 score += 5
         elif kw in line_words:
             score += weight * 0.4
 
     # Cross-entity penalty
-    for other_type, odef in ENTITY_DEFS.items():
-        if other_type == entity_type:
-            continue
-        if odef["format"].match(raw) or odef["format"].match(clean):
-            other_score = 0
-            for kw, w in odef["context_keywords"].items():
-                if kw.lower().rstrip('.') in surrounding or kw.lower().rstrip('.') in line_words:
-                    other_score += w
-            if other_score > 5:
-                score -= 20
+    for other_type in strong_entities:
+        if other_type != entity_type:
+            score -= 20
 
     # Special: single-digit invoice numbers need strong context to win
     if entity_type == "INVOICE_NUMBER" and len(clean) == 1:
@@ -327,25 +392,94 @@ def score_token_for_entity(token, entity_type):
     return max(score, 0)
 
 
-def find_entity(tokens, entity_type, top_n=3):
-    candidates = []
+def _format_hits(raw, clean):
+    # Try both raw and cleaned against each format
+    return {
+        entity_type: bool(fmt.match(raw) or fmt.match(clean))
+        for entity_type, fmt, _ in _ENTITY_LIST
+    }
+
+
+def score_all_entities(tokens, top_n=3):
+    """
+    Top candidates for every entity type in one walk over the tokens.
+    Each token's formats are matched once and its context built once,
+    then shared by all entity types it could be.
+    """
+    candidates = {entity_type: [] for entity_type, _, _ in _ENTITY_LIST}
     seen = set()
     for token in tokens:
-        clean = token.text.strip()
-        if clean in seen:
+        raw = token.text.strip()
+        if raw in seen:
             continue
-        seen.add(clean)
-        s = score_token_for_entity(token, entity_type)
-        if s > 0:
-            candidates.append((token, s))
-    candidates.sort(key=lambda x: x[1], reverse=True)
-    return candidates[:top_n]
+        seen.add(raw)
+        # Strip trailing periods before the format check; raw is tried as well
+        clean = raw.rstrip('.')
+
+        # Negative lines can only yield phone numbers; skip the other formats
+        # unless the token is one
+        if token.negative_line and not (_PHONE_FORMAT.match(raw) or _PHONE_FORMAT.match(clean)):
+            continue
+
+        if not (_ANY_FORMAT_RE.match(raw) or _ANY_FORMAT_RE.match(clean)):
+            continue
+        fmt_hits = _format_hits(raw, clean)
+
+        surrounding, line_words, all_context = _token_context(token)
+        # The cross-entity penalty depends only on the token, not on the
+        # entity being scored, so work it out once here
+        strong_entities = _context_entities(fmt_hits, all_context)
+        for entity_type, hit in fmt_hits.items():
+            if not hit:
+                continue
+            s = _score_in_context(token, entity_type, strong_entities, clean,
+                                  surrounding, line_words, all_context)
+            if s > 0:
+                candidates[entity_type].append((token, s))
+
+    for cands in candidates.values():
+        cands.sort(key=lambda x: x[1], reverse=True)
+    return {entity_type: cands[:top_n] for entity_type, cands in candidates.items()}
 
 
 # ─────────────────────────────────────────────
 # 6.  SPECIALIZED EXTRACTORS
 # ─────────────────────────────────────────────
 
+_ACCOUNT_HOLDER_RE = re.compile(r'account\s+holder', re.IGNORECASE)
+_ACCOUNT_HOLDER_LABEL_RE = re.compile(r'(account\s+holder|name|:|-)', re.IGNORECASE)
+_HOLDER_NAME_RE = re.compile(r"^[A-Za-z][A-Za-z\s\.&'\-\d]*$")
+_PAYEE_RE = re.compile(
+    r'(?:payee|beneficiary|supplier|from|raised\s+by|prepared\s+by)\s*[:\-]?\s*'
+    r"([A-Za-z][A-Za-z\s\.&,'\-\d]+)",
+    re.IGNORECASE
+)
+_BANK_DETAILS_LINE_RE = re.compile(r'bank\s+details|your\s+bank', re.IGNORECASE)
+_INLINE_NAME_RE = re.compile(r"NAME\s*[-–—:]\s*([A-Za-z][A-Za-z\s\.&'\-\d]+?)(?:,|$)", re.IGNORECASE)
+_BILL_TO_RE = re.compile(r"Bill\s+[Tt]o\s*[:\-]?\s*([A-Za-z][A-Za-z\s\.&,'\-\d]+)", re.IGNORECASE)
+_BILL_TO_NEXT_LINE_RE = re.compile(r"^[A-Za-z][A-Za-z\s\.&,'\-\d]+$")
+_INVOICE_HEADING_RE = re.compile(r'^INVOICE\b', re.IGNORECASE)
+_HEADING_NAME_RE = re.compile(r"^[A-Z][A-Za-z\s\.&'\-\d]+$")
+_HEADER_NAME_RE = re.compile(r"^[A-Z][A-Za-z\s\.&,'\-\d]+$")
+# Label keywords that disqualify a header line as a party name
+_HEADER_SKIP_RE = re.compile(
+    r'invoice|phone|email|address|gst|pan|date|total|amount|bank|ifsc'
+    r'|place|supply|description|service|bill to|ship to|payee|beneficiary',
+    re.IGNORECASE
+)
+
+# Words/phrases that are NEVER valid party names (matched as lowercase prefixes)
+PARTY_BLOCKLIST = (
+    'bank of india', 'hdfc bank', 'icici bank', 'sbi', 'axis bank',
+    'kotak mahindra bank', 'punjab national bank', 'union bank',
+    'bank of baroda', 'canara bank', 'indusind bank', 'yes bank',
+    'federal bank', 'bandhan bank', 'rbl bank',
+    'account', 'amount', 'total', 'invoice', 'bank', 'ifsc',
+    'description', 'particulars', 'remarks', 'authorised signatory',
+    'authorized signatory', 'signature',
+)
+
+
 def extract_party_name(text, tokens):
     """
     Multi-strategy party name extraction (priority order):
@@ -356,94 +490,83 @@ def extract_party_name(text, tokens):
       5. Name right after INVOICE heading
       6. Capitalised name in header lines 0–8
     """
-    candidates = []
     lines = text.split("\n")
 
-    # --- 1: Account Holder ---
+    # Skip a strategy when its label never appears.  Non-ASCII text can match
+    # labels containing i or s case-insensitively without lowering to them.
+    lowered = text.lower()
+    ascii_only = text.isascii()
+    use_holder = 'holder' in lowered
+    use_payee = (not ascii_only or 'payee' in lowered or 'beneficiar' in lowered
+                 or 'supplier' in lowered or 'from' in lowered
+                 or 'raised' in lowered or 'prepared' in lowered)
+    use_inline = 'bank' in lowered
+    use_bill_to = not ascii_only or 'bill' in lowered
+    use_heading = not ascii_only or 'invoice' in lowered
+
+    # One walk over the lines; each strategy collects into its own list so the
+    # final order (and so tie-breaking) is strategy order, then line order.
+    holder, payee, inline, bill_to, heading, header = [], [], [], [], [], []
     for i, line in enumerate(lines):
-        if re.search(r'account\s+holder', line, re.IGNORECASE):
+        # --- 1: Account Holder ---
+        if use_holder and _ACCOUNT_HOLDER_RE.search(line):
             for j in range(i, min(i + 3, len(lines))):
-                c = re.sub(r'(account\s+holder|name|:|-)', '', lines[j], flags=re.IGNORECASE).strip()
-                if c and re.match(r"^[A-Za-z][A-Za-z\s\.&'\-\d]*$", c) and 3 < len(c) < 80:
-                    candidates.append((c, 50 + (10 if c.isupper() else 0)))
+                c = _ACCOUNT_HOLDER_LABEL_RE.sub('', lines[j]).strip()
+                if c and _HOLDER_NAME_RE.match(c) and 3 < len(c) < 80:
+                    holder.append((c, 50 + (10 if c.isupper() else 0)))
 
-    # --- 2: Payee / Beneficiary / Supplier / From / Raised by / Prepared by ---
-    for line in lines:
-        m = re.search(
-            r'(?:payee|beneficiary|supplier|from|raised\s+by|prepared\s+by)\s*[:\-]?\s*'
-            r"([A-Za-z][A-Za-z\s\.&,'\-\d]+)",
-            line, re.IGNORECASE
-        )
-        if m:
-            c = m.group(1).strip().rstrip(',')
-            if 3 < len(c) < 80:
-                candidates.append((c, 42))
+        # --- 2: Payee / Beneficiary / Supplier / From / Raised by / Prepared by ---
+        if use_payee:
+            m = _PAYEE_RE.search(line)
+            if m:
+                c = m.group(1).strip().rstrip(',')
+                if 3 < len(c) < 80:
+                    payee.append((c, 42))
 
-    # --- 3: NAME inside inline bank detail ---
-    for line in lines:
-        if re.search(r'bank\s+details|your\s+bank', line, re.IGNORECASE):
-            m = re.search(r"NAME\s*[-–—:]\s*([A-Za-z][A-Za-z\s\.&'\-\d]+?)(?:,|$)", line, re.IGNORECASE)
+        # --- 3: NAME inside inline bank detail ---
+        if use_inline and _BANK_DETAILS_LINE_RE.search(line):
+            m = _INLINE_NAME_RE.search(line)
             if m:
                 c = m.group(1).strip()
                 if 3 < len(c) < 80:
-                    candidates.append((c, 38))
+                    inline.append((c, 38))
 
-    # --- 4: Bill To: label ---
-    for i, line in enumerate(lines):
-        m = re.search(r"Bill\s+[Tt]o\s*[:\-]?\s*([A-Za-z][A-Za-z\s\.&,'\-\d]+)", line, re.IGNORECASE)
-        if m:
-            c = m.group(1).strip().rstrip(',')
-            if 3 < len(c) < 80:
-                candidates.append((c, 36))
-            else:
-                # Value might be on the next line
-                for j in range(i + 1, min(i + 3, len(lines))):
-                    c2 = lines[j].strip()
-                    if c2 and re.match(r"^[A-Za-z][A-Za-z\s\.&,'\-\d]+$", c2) and 3 < len(c2) < 80:
-                        candidates.append((c2, 34))
-                        break
-
-    # --- 5: Name after INVOICE heading ---
-    for i, line in enumerate(lines):
-        if re.match(r'^INVOICE\b', line.strip(), re.IGNORECASE):
+        # --- 4: Bill To: label ---
+        if use_bill_to:
+            m = _BILL_TO_RE.search(line)
+            if m:
+                c = m.group(1).strip().rstrip(',')
+                if 3 < len(c) < 80:
+                    bill_to.append((c, 36))
+                else:
+                    # Value might be on the next line
+                    for j in range(i + 1, min(i + 3, len(lines))):
+                        c2 = lines[j].strip()
+                        if c2 and _BILL_TO_NEXT_LINE_RE.match(c2) and 3 < len(c2) < 80:
+                            bill_to.append((c2, 34))
+                            break
+
+        # --- 5: Name after INVOICE heading ---
+        if use_heading and _INVOICE_HEADING_RE.match(line.strip()):
             for j in range(i + 1, min(i + 3, len(lines))):
                 c = lines[j].strip()
-                if c and re.match(r"^[A-Z][A-Za-z\s\.&'\-\d]+$", c) and 3 < len(c) < 60:
-                    candidates.append((c, 40))
+                if c and _HEADING_NAME_RE.match(c) and 3 < len(c) < 60:
+                    heading.append((c, 40))
                     break
 
-    # --- 6: Header lines 0–8 (capitalised, no label keywords) ---
-    skip_words = ['invoice', 'phone', 'email', 'address', 'gst', 'pan',
-                  'date', 'total', 'amount', 'bank', 'ifsc',
-                  'place', 'supply', 'description', 'service',
-                  'bill to', 'ship to', 'payee', 'beneficiary']
-    for i, line in enumerate(lines[:9]):
-        line_s = line.strip()
-        if not line_s:
-            continue
-        if re.match(r"^[A-Z][A-Za-z\s\.&,'\-\d]+$", line_s) and 3 < len(line_s) < 60:
-            if any(sw in line_s.lower() for sw in skip_words):
-                continue
-            score = 25 + (8 if i <= 2 else 0) + (5 if line_s.isupper() else 0)
-            candidates.append((line_s, score))
-
-    # Words/phrases that are NEVER valid party names
-    PARTY_BLOCKLIST = [
-        'bank of india', 'hdfc bank', 'icici bank', 'sbi', 'axis bank',
-        'kotak mahindra bank', 'punjab national bank', 'union bank',
-        'bank of baroda', 'canara bank', 'indusind bank', 'yes bank',
-        'federal bank', 'bandhan bank', 'rbl bank',
-        'account', 'amount', 'total', 'invoice', 'bank', 'ifsc',
-        'description', 'particulars', 'remarks', 'authorised signatory',
-        'authorized signatory', 'signature',
-    ]
-
-    def is_blocked(name):
-        n = name.lower().strip()
-        return any(n == b or n.startswith(b) for b in PARTY_BLOCKLIST)
+        # --- 6: Header lines 0–8 (capitalised, no label keywords) ---
+        if i < 9:
+            line_s = line.strip()
+            if (line_s and _HEADER_NAME_RE.match(line_s) and 3 < len(line_s) < 60
+                    and not _HEADER_SKIP_RE.search(line_s)):
+                score = 25 + (8 if i <= 2 else 0) + (5 if line_s.isupper() else 0)
+                header.append((line_s, score))
+
+    candidates = holder + payee + inline + bill_to + heading + header
 
     # Filter all candidates through blocklist before returning
-    candidates = [(n, s) for n, s in candidates if not is_blocked(n)]
+    candidates = [(n, s) for n, s in candidates
+                  if not n.lower().strip().startswith(PARTY_BLOCKLIST)]
 
     if not candidates:
         return "", 0
@@ -451,6 +574,22 @@ def extract_party_name(text, tokens):
     return candidates[0]
 
 
+_ALPHANUMERIC_INVOICE_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in (
+    # INV/INVOICE/BILL/REF prefix → digits with optional / or -
+    r'(?:INV(?:OICE)?|BILL|REF)\s*[-/#:]?\s*(\d[\d/\-]*\d)',
+    # "Invoice No" or "Bill No" → code that must contain at least one digit
+    r'(?:Invoice|Bill)\s+No\.?\s*[:\-]?\s*([A-Z0-9][\w/\-]{0,20})',
+))
+_DIGIT_RE = re.compile(r'\d')
+
+# Words an invoice-number capture must never be
+LABEL_WORDS = frozenset({
+    'dated', 'date', 'no', 'number', 'amount', 'total',
+    'description', 'particulars', 'service', 'qty', 'rate',
+    'tax', 'gst', 'pan', 'ifsc', 'bank', 'account',
+})
+
+
 def extract_alphanumeric_invoice(text):
     """
     Catch alphanumeric invoice numbers the pure-digit scorer misses:
@@ -458,56 +597,80 @@ def extract_alphanumeric_invoice(text):
       Invoice No. ABC-123, Bill No: 7
     Never returns plain words like 'Dated'.
     """
-    LABEL_WORDS = {'dated', 'date', 'no', 'number', 'amount', 'total',
-                   'description', 'particulars', 'service', 'qty', 'rate',
-                   'tax', 'gst', 'pan', 'ifsc', 'bank', 'account'}
-
-    patterns = [
-        # INV/INVOICE/BILL/REF prefix → digits with optional / or -
-        r'(?:INV(?:OICE)?|BILL|REF)\s*[-/#:]?\s*(\d[\d/\-]*\d)',
-        # "Invoice No" or "Bill No" → code that must contain at least one digit
-        r'(?:Invoice|Bill)\s+No\.?\s*[:\-]?\s*([A-Z0-9][\w/\-]{0,20})',
-    ]
-    for p in patterns:
-        m = re.search(p, text, re.IGNORECASE)
+    # Both patterns need an inv/bill/ref label.  Non-ASCII text can match
+    # them case-insensitively (dotless i) without lowering to them.
+    lowered = text.lower()
+    if (text.isascii() and 'inv' not in lowered
+            and 'bill' not in lowered and 'ref' not in lowered):
+        return ""
+    for pattern in _ALPHANUMERIC_INVOICE_PATTERNS:
+        m = pattern.search(text)
         if m:
             val = m.group(1).strip().strip('/-')
             # Must contain a digit and not be a blocked label word
-            if val and re.search(r'\d', val) and val.lower() not in LABEL_WORDS:
+            if val and _DIGIT_RE.search(val) and val.lower() not in LABEL_WORDS:
                 return val
     return ""
 
 
+def _parse_amount(raw):
+    """Parse a comma-grouped decimal string; returns None if it isn't a number."""
+    # Callers only pass digits, commas and dots, so a shape check replaces try/except
+    num = raw.replace(',', '')
+    whole, _, frac = num.partition('.')
+    if not (whole or frac):
+        return None
+    if (whole and not whole.isdecimal()) or (frac and not frac.isdecimal()):
+        return None
+    return float(num)
+
+
+# Priority-ordered: the first pattern yielding a value >= 10 wins.
+_BARE_AMOUNT_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in (
+    # Grand Total / Total (with optional currency prefix)
+    r'(?:Grand\s+)?Total\s*[:\-]?\s*(?:Rs\.?|INR|₹)?\s*([\d,]+(?:\.\d{1,2})?)\b',
+    # Net Amount / Amount
+    r'(?:Net\s+)?Amount\s*[:\-]?\s*(?:Rs\.?|INR|₹)?\s*([\d,]+(?:\.\d{1,2})?)\b',
+    # Amount Payable
+    r'Amount\s+Payable\s*[:\-]?\s*(?:Rs\.?|INR|₹)?\s*([\d,]+(?:\.\d{1,2})?)\b',
+    # Amount Chargeable
+    r'Amount\s+Chargeable\s*[:\-]?\s*(?:Rs\.?|INR|₹)?\s*([\d,]+(?:\.\d{1,2})?)\b',
+    # Balance Due / Balance Amount
+    r'Balance\s+(?:Due|Amount)\s*[:\-]?\s*(?:Rs\.?|INR|₹)?\s*([\d,]+(?:\.\d{1,2})?)\b',
+))
+
+
 def extract_bare_amount(text):
     """
     Catch amounts that are bare integers OR comma-formatted but didn't score
     via NLP (e.g. near Total/Amount labels without being in a scored context).
     Handles: 'Total 10000', 'Total 10,000', 'Amount: ₹50000', 'Amount Chargeable 3000'
     """
-    patterns = [
-        # Grand Total / Total (with optional currency prefix)
-        r'(?:Grand\s+)?Total\s*[:\-]?\s*(?:Rs\.?|INR|₹)?\s*([\d,]+(?:\.\d{1,2})?)\b',
-        # Net Amount / Amount
-        r'(?:Net\s+)?Amount\s*[:\-]?\s*(?:Rs\.?|INR|₹)?\s*([\d,]+(?:\.\d{1,2})?)\b',
-        # Amount Payable
-        r'Amount\s+Payable\s*[:\-]?\s*(?:Rs\.?|INR|₹)?\s*([\d,]+(?:\.\d{1,2})?)\b',
-        # Amount Chargeable
-        r'Amount\s+Chargeable\s*[:\-]?\s*(?:Rs\.?|INR|₹)?\s*([\d,]+(?:\.\d{1,2})?)\b',
-        # Balance Due / Balance Amount
-        r'Balance\s+(?:Due|Amount)\s*[:\-]?\s*(?:Rs\.?|INR|₹)?\s*([\d,]+(?:\.\d{1,2})?)\b',
-    ]
-    for p in patterns:
-        m = re.search(p, text, re.IGNORECASE)
+    # Every pattern needs one of these labels; skip the scans when none appear
+    lowered = text.lower()
+    if 'total' not in lowered and 'amount' not in lowered and 'balance' not in lowered:
+        return ""
+    for pattern in _BARE_AMOUNT_PATTERNS:
+        m = pattern.search(text)
         if m:
             val = m.group(1).replace(',', '')
-            try:
-                if float(val) >= 10:
-                    return val
-            except ValueError:
-                continue
+            amt = _parse_amount(val)
+            if amt is not None and amt >= 10:
+                return val
     return ""
 
 
+_CELL_SLASH_DASH_RE = re.compile(r'/[-–—]')
+_CELL_CURRENCY_RE = re.compile(r'(?:Rs\.?|₹|INR)\s*')
+_CELL_NON_NUMERIC_RE = re.compile(r'[^\d,.]')
+# ASCII-only equivalent of _CELL_NON_NUMERIC_RE for str.translate; non-ASCII
+# cells still use the regex since \d also keeps Unicode digits
+_CELL_NON_NUMERIC_TABLE = str.maketrans(
+    '', '', ''.join(chr(c) for c in range(128) if chr(c) not in '0123456789,.')
+)
+_CURRENCY_FORMAT_RE = re.compile(r'^\d{1,3}(,\d{3})*\.\d{2}$')
+
+
 def extract_amount_from_tables(tables):
     """
     Table-aware amount extraction.  Finds Amount/Total column headers,
@@ -526,8 +689,13 @@ def extract_amount_from_tables(tables):
             if not row:
                 continue
             for col_idx, cell in enumerate(row):
-                if cell and re.search(r'amount|total', str(cell), re.IGNORECASE):
+                if not cell:
+                    continue
+                header = str(cell).lower()
+                if 'amount' in header or 'total' in header:
                     amount_col_indices.add(col_idx)
+        if not amount_col_indices:
+            continue
 
         # Pull values from every amount column
         for row in table:
@@ -536,29 +704,32 @@ def extract_amount_from_tables(tables):
             for col_idx in amount_col_indices:
                 if col_idx < len(row) and row[col_idx]:
                     raw = str(row[col_idx]).strip()
-                    # Strip /- suffix and currency prefixes
-                    raw = re.sub(r'/[-–—]', '', raw)
-                    raw = re.sub(r'(?:Rs\.?|₹|INR)\s*', '', raw)
-                    raw = re.sub(r'[^\d,.]', '', raw)
+                    # Strip /- suffix and currency prefixes.  Only 'Rs.' needs its
+                    # own pass (its dot would survive); everything else is
+                    # non-numeric and goes in the final strip.
+                    if 'R' in raw:
+                        raw = _CELL_SLASH_DASH_RE.sub('', raw)
+                        raw = _CELL_CURRENCY_RE.sub('', raw)
+                    if raw.isascii():
+                        raw = raw.translate(_CELL_NON_NUMERIC_TABLE)
+                    else:
+                        raw = _CELL_NON_NUMERIC_RE.sub('', raw)
                     if not raw:
                         continue
-                    try:
-                        val = float(raw.replace(',', ''))
-                        if 10 <= val < 1e8:
-                            score = 10
-                            if '.' in raw:
-                                score += 15
-                            if re.match(r'^\d{1,3}(,\d{3})*\.\d{2}$', raw):
-                                score += 20
-                            candidates.append((raw.replace(',', ''), score, val))
-                    except ValueError:
-                        continue
+                    val = _parse_amount(raw)
+                    if val is not None and 10 <= val < 1e8:
+                        score = 10
+                        if '.' in raw:
+                            score += 15
+                        if _CURRENCY_FORMAT_RE.match(raw):
+                            score += 20
+                        candidates.append((raw.replace(',', ''), score, val))
 
     if not candidates:
         return "", 0
-    # Sort by score desc, then value desc (totals are usually largest)
-    candidates.sort(key=lambda x: (x[1], x[2]), reverse=True)
-    return candidates[0][0], candidates[0][1]
+    # Highest score, then largest value (totals are usually largest)
+    best = max(candidates, key=lambda x: (x[1], x[2]))
+    return best[0], best[1]
 
 
 # ─────────────────────────────────────────────
@@ -581,40 +752,54 @@ MONTH_MAP = {
 }
 
 
+# One anchored union: ISO first, then DD-MonthName-YY(YY), then DD-MM-YY(YY),
+# so a single match() reproduces the old three-step fallback order.
+_DATE_NORMALIZE_RE = re.compile(
+    r'(?P<iso_year>\d{4})[-./](?P<iso_month>\d{1,2})[-./](?P<iso_day>\d{1,2})$'
+    r'|(?P<day>\d{1,2})[-./]\s*(?:(?P<month_name>[A-Za-z]{3,9})|(?P<month>\d{1,2}))'
+    r'\s*[-./](?P<year>\d{2,4})'
+)
+
+
+@lru_cache(maxsize=1024)
 def normalize_date(date_str):
-    """Normalize any detected date to DD-MM-YYYY."""
+    """Normalize any detected date to DD-MM-YYYY.  Cached: batches often share dates."""
     if not date_str:
         return ""
 
-    # YYYY-MM-DD (ISO)
-    m = re.match(r'(\d{4})[-./](\d{1,2})[-./](\d{1,2})$', date_str)
-    if m:
-        year = m.group(1)
-        month = m.group(2).zfill(2)
-        day = m.group(3).zfill(2)
-        return f"{day}-{month}-{year}"
+    # Already DD-MM-YYYY: nothing to rewrite
+    if (len(date_str) == 10 and date_str[2] == '-' and date_str[5] == '-'
+            and date_str[:2].isdecimal() and date_str[3:5].isdecimal() and date_str[6:].isdecimal()):
+        return date_str
 
-    # DD-MonthName-YY/YYYY
-    m = re.match(r'(\d{1,2})[-./]\s*([A-Za-z]{3,9})\s*[-./](\d{2,4})', date_str)
-    if m:
-        day = m.group(1).zfill(2)
-        month = MONTH_MAP.get(m.group(2).lower(), '01')
-        year = m.group(3)
-        if len(year) == 2:
-            year = '20' + year
-        return f"{day}-{month}-{year}"
-
-    # DD-MM-YY/YYYY
-    m = re.match(r'(\d{1,2})[-./]\s*(\d{1,2})\s*[-./](\d{2,4})', date_str)
-    if m:
-        day = m.group(1).zfill(2)
-        month = m.group(2).zfill(2)
-        year = m.group(3)
-        if len(year) == 2:
-            year = '20' + year
-        return f"{day}-{month}-{year}"
+    m = _DATE_NORMALIZE_RE.match(date_str)
+    if not m:
+        return date_str
 
-    return date_str
+    # YYYY-MM-DD (ISO)
+    if m.group('iso_year'):
+        day = m.group('iso_day').zfill(2)
+        month = m.group('iso_month').zfill(2)
+        return f"{day}-{month}-{m.group('iso_year')}"
+
+    # DD-MonthName-YY/YYYY or DD-MM-YY/YYYY
+    day = m.group('day').zfill(2)
+    if m.group('month_name'):
+        month = MONTH_MAP.get(m.group('month_name').lower(), '01')
+    else:
+        month = m.group('month').zfill(2)
+    year = m.group('year')
+    if len(year) == 2:
+        year = '20' + year
+    return f"{day}-{month}-{year}"
+
+
+_FULL_MONTH_DATE_PATTERNS = (
+    # Day Month Year:  28 Nov 2025
+    (re.compile(r'\b(\d{1,2})\s+([A-Za-z]{3,9})\s+(\d{2,4})\b'), 'dmy'),
+    # Month Day, Year: Nov 28, 2025  /  November 28 2025
+    (re.compile(r'\b([A-Za-z]{3,9})\s+(\d{1,2}),?\s+(\d{2,4})\b'), 'mdy'),
+)
 
 
 def extract_full_month_date(text):
@@ -625,19 +810,12 @@ def extract_full_month_date(text):
     Prefers dates near 'date'/'dated'/'invoice' labels.
     Falls back to last match (invoice dates tend to be later in doc).
     """
-    # Collect all matches — both orderings
-    patterns = [
-        # Day Month Year:  28 Nov 2025
-        (r'\b(\d{1,2})\s+([A-Za-z]{3,9})\s+(\d{2,4})\b', 'dmy'),
-        # Month Day, Year: Nov 28, 2025  /  November 28 2025
-        (r'\b([A-Za-z]{3,9})\s+(\d{1,2}),?\s+(\d{2,4})\b', 'mdy'),
-    ]
-
     best = None
     best_score = -1
 
-    for pattern, order in patterns:
-        for m in re.finditer(pattern, text):
+    # Collect all matches — both orderings
+    for pattern, order in _FULL_MONTH_DATE_PATTERNS:
+        for m in pattern.finditer(text):
             if order == 'dmy':
                 day_s, month_s, year_s = m.group(1), m.group(2), m.group(3)
             else:  # mdy
@@ -706,9 +884,55 @@ IFSC_PREFIX_MAP = {
     "NWOS": "North Western Co-op Bank",
     "MHCB": "Maharashtra Co-op Bank",
     "FIBL": "First International Bank",
+    "IDIB": "Indian Bank",
+    "IOBA": "Indian Overseas Bank",
+    "MAHB": "Bank of Maharashtra",
+    "PSIB": "Punjab & Sind Bank",
+    "CBIN": "Central Bank of India",
+    "IDFB": "IDFC FIRST Bank",
+    "KARB": "Karnataka Bank",
+    "CSBK": "CSB Bank",
+    "CIUB": "City Union Bank",
+    "DLXB": "Dhanlaxmi Bank",
+    "NTBL": "Nainital Bank",
+    "SCBL": "Standard Chartered Bank",
+    "DBSS": "DBS Bank India",
+    "DEUT": "Deutsche Bank",
+    "BOFA": "Bank of America",
+    "BNPA": "BNP Paribas",
+    "CHAS": "JPMorgan Chase Bank",
+    "PYTM": "Paytm Payments Bank",
+    "AIRP": "Airtel Payments Bank",
+    "IPOS": "India Post Payments Bank",
+    "FINO": "Fino Payments Bank",
+    "JIOP": "Jio Payments Bank",
+    "NSPB": "NSDL Payments Bank",
+    "ESMF": "ESAF Small Finance Bank",
+    "ESFB": "Equitas Small Finance Bank",
+    "JSFB": "Jana Small Finance Bank",
+    "UJVN": "Ujjivan Small Finance Bank",
+    "SURY": "Suryoday Small Finance Bank",
+    "UTKS": "Utkarsh Small Finance Bank",
+    "NESF": "North East Small Finance Bank",
+    "CLBL": "Capital Small Finance Bank",
+    "SMCB": "Shivalik Small Finance Bank",
+    "COSB": "Cosmos Co-op Bank",
+    "SRCB": "Saraswat Co-op Bank",
+    "TJSB": "TJSB Sahakari Bank",
+    "SVCB": "SVC Co-op Bank",
+    "ABHY": "Abhyudaya Co-op Bank",
+    "NKGS": "NKGSB Co-op Bank",
+    "DNSB": "Dombivli Nagari Sahakari Bank",
 }
 
 
+def _is_ifsc(code):
+    """True for a well-formed IFSC: 4 uppercase ASCII letters + 7 digits."""
+    prefix = code[:4]
+    return (len(code) == 11 and prefix.isascii() and prefix.isalpha()
+            and prefix.isupper() and code[4:].isdecimal())
+
+
 def derive_bank_name(ifsc):
     if not ifsc or len(ifsc) < 4:
         return ""
@@ -720,6 +944,45 @@ def derive_bank_name(ifsc):
 # 9.  BANK DETAILS FALLBACK PARSER
 # ─────────────────────────────────────────────
 
+# Each list is priority-ordered: the first pattern that matches wins.
+_ACCOUNT_NO_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in (
+    # Explicit "BANK ACCOUNT NO"
+    r'BANK\s+ACCOUNT\s+NO\.?\s*[-–—:]\s*(\d{9,18})',
+    # "Account Number/No" with separator
+    r'Account\s+(?:Number|No\.?)\s*[-–—:]\s*(\d{9,18})',
+    # Saving/Current A/C
+    r'(?:Saving|Current)\s+A\s*/?\s*C\s*(?:No\.?|Number)?\s*[-–—:]\s*(\d{9,18})',
+    # A/C or AC or A.C variants
+    r'A\s*[/\.]\s*C\s*(?:No\.?|Number)?\s*[-–—:]\s*(\d{9,18})',
+    # Acc / Acct
+    r'Acc(?:ount|t)?\s*(?:No\.?|Number)?\s*[-–—:]\s*(\d{9,18})',
+    # Beneficiary Account
+    r'Beneficiary\s+(?:Account|A\s*/?\s*C)\s*(?:No\.?)?\s*[-–—:]\s*(\d{9,18})',
+    # Credit Account
+    r'Credit\s+(?:Account|A\s*/?\s*C)\s*(?:No\.?)?\s*[-–—:]\s*(\d{9,18})',
+    # Pay to / Transfer to
+    r'(?:Pay|Transfer)\s+[Tt]o\s*[:\-]?\s*(\d{9,18})',
+    # Last resort: any account/ac/acc keyword followed (loosely) by digits
+    r'(?:account|a\s*/?\s*c|acc)\D{0,15}(\d{9,18})',
+    # Spaced / dashed / dotted account number after a label
+    # e.g. "Account no. 4500 1011 0017 123" — collapse and validate length
+    r'(?:account|a\s*/?\s*c|acc)\D{0,15}([\d][\d\s\-\.]{8,25}[\d])',
+))
+
+_IFSC_LABEL_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'IFSC\s*(?:Code)?\s*[-–—:]\s*([A-Z]{4}\d{7})',
+    r'IFSC\s*[-–—:]?\s*([A-Z]{4}\d{7})',
+))
+# Bare IFSC anywhere (last resort)
+_IFSC_BARE_RE = re.compile(r'\b([A-Z]{4}\d{7})\b', re.IGNORECASE)
+
+_BANK_NAME_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'BANK\s+NAME\s*[-–—:]\s*([A-Za-z\s\.&]+?)(?:,|\n|$)',
+    # Just "Bank:" or "Bank-" followed by name
+    r'Bank\s*[-–—:]\s*([A-Za-z][A-Za-z\s\.&]+?)(?:,|\n|$)',
+))
+
+
 def parse_bank_details_fallback(text):
     """
     Catches bank details in every common Indian invoice format.
@@ -743,66 +1006,42 @@ def parse_bank_details_fallback(text):
     result = {}
 
     # ── Account number ──
-    acc_patterns = [
-        # Explicit "BANK ACCOUNT NO"
-        r'BANK\s+ACCOUNT\s+NO\.?\s*[-–—:]\s*(\d{9,18})',
-        # "Account Number/No" with separator
-        r'Account\s+(?:Number|No\.?)\s*[-–—:]\s*(\d{9,18})',
-        # Saving/Current A/C
-        r'(?:Saving|Current)\s+A\s*/?\s*C\s*(?:No\.?|Number)?\s*[-–—:]\s*(\d{9,18})',
-        # A/C or AC or A.C variants
-        r'A\s*[/\.]\s*C\s*(?:No\.?|Number)?\s*[-–—:]\s*(\d{9,18})',
-        # Acc / Acct
-        r'Acc(?:ount|t)?\s*(?:No\.?|Number)?\s*[-–—:]\s*(\d{9,18})',
-        # Beneficiary Account
-        r'Beneficiary\s+(?:Account|A\s*/?\s*C)\s*(?:No\.?)?\s*[-–—:]\s*(\d{9,18})',
-        # Credit Account
-        r'Credit\s+(?:Account|A\s*/?\s*C)\s*(?:No\.?)?\s*[-–—:]\s*(\d{9,18})',
-        # Pay to / Transfer to
-        r'(?:Pay|Transfer)\s+[Tt]o\s*[:\-]?\s*(\d{9,18})',
-        # Last resort: any account/ac/acc keyword followed (loosely) by digits
-        r'(?:account|a\s*/?\s*c|acc)\D{0,15}(\d{9,18})',
-        # Spaced / dashed / dotted account number after a label
-        # e.g. "Account no. 4500 1011 0017 123" — collapse and validate length
-        r'(?:account|a\s*/?\s*c|acc)\D{0,15}([\d][\d\s\-\.]{8,25}[\d])',
-    ]
-    for p in acc_patterns:
-        m = re.search(p, text, re.IGNORECASE)
+    for pattern in _ACCOUNT_NO_PATTERNS:
+        m = pattern.search(text)
         if m:
             raw = m.group(1).strip()
             # Collapse any internal spaces/dashes/dots
-            digits = re.sub(r'[\s\-\.]', '', raw)
+            digits = _DIGIT_SEPARATORS_RE.sub('', raw)
             if 9 <= len(digits) <= 18 and digits.isdigit():
                 result["account_no"] = digits
                 break
 
+    # Cheap literal checks so label patterns only scan text that has the label.
+    # Non-ASCII text can match 'ifsc' case-insensitively without lowering to it.
+    lowered = text.lower()
+    has_ifsc_label = 'ifsc' in lowered or not text.isascii()
+
     # ── IFSC ──
-    ifsc_patterns = [
-        r'IFSC\s*(?:Code)?\s*[-–—:]\s*([A-Z]{4}\d{7})',
-        r'IFSC\s*[-–—:]?\s*([A-Z]{4}\d{7})',
-        # Bare IFSC anywhere (last resort)
-        r'\b([A-Z]{4}\d{7})\b',
-    ]
-    for p in ifsc_patterns:
-        m = re.search(p, text, re.IGNORECASE)
-        if m:
-            result["ifsc"] = m.group(1).upper().strip()
-            break
+    m = None
+    if has_ifsc_label:
+        for pattern in _IFSC_LABEL_PATTERNS:
+            m = pattern.search(text)
+            if m:
+                break
+    if not m:
+        m = _IFSC_BARE_RE.search(text)
+    if m:
+        result["ifsc"] = m.group(1).upper().strip()
 
     # ── Bank name ──
-    bank_patterns = [
-        r'BANK\s+NAME\s*[-–—:]\s*([A-Za-z\s\.&]+?)(?:,|\n|$)',
-        r'Bank\s+Name\s*[-–—:]\s*([A-Za-z\s\.&]+?)(?:,|\n|$)',
-        # Just "Bank:" or "Bank-" followed by name
-        r'Bank\s*[-–—:]\s*([A-Za-z][A-Za-z\s\.&]+?)(?:,|\n|$)',
-    ]
-    for p in bank_patterns:
-        m = re.search(p, text, re.IGNORECASE)
-        if m:
-            name = m.group(1).strip().rstrip(',')
-            if len(name) > 2:
-                result["bank_name"] = name
-                break
+    if 'bank' in lowered:
+        for pattern in _BANK_NAME_PATTERNS:
+            m = pattern.search(text)
+            if m:
+                name = m.group(1).strip().rstrip(',')
+                if len(name) > 2:
+                    result["bank_name"] = name
+                    break
 
     return result
 
@@ -822,7 +1061,7 @@ def validate_extraction(record):
 
     # IFSC sanity: must be 4 letters + 7 digits
     ifsc = record.get("IFSC Code", "")
-    if ifsc and not re.match(r'^[A-Z]{4}\d{7}$', ifsc):
+    if ifsc and not _is_ifsc(ifsc):
         warnings.append(f"IFSC Code '{ifsc}' doesn't match expected format (4 letters + 7 digits)")
 
     inv = record.get("Invoice No.", "")
@@ -851,162 +1090,213 @@ def validate_extraction(record):
 # 11. MAIN EXTRACTION PIPELINE
 # ─────────────────────────────────────────────
 
+_INVOICE_LABEL_RE = re.compile(r'invoice|bill\s+no|inv\s+no')
+# Amount label plus separator; an invoice candidate right after it is really an amount
+_AMOUNT_LABEL_PREFIX_RE = re.compile(
+    r'(?:total|amount|grand|net|balance)\s*[:\-]?\s*', re.IGNORECASE
+)
+
+
+def _extract_text(pdf):
+    """Return the text of every page, one trailing newline per page."""
+    text_parts = []
+    for page in pdf.pages:
+        # layout=False is pdfplumber's default; pinned here because the
+        # layout-preserving mode pads lines and is much slower.
+        page_text = page.extract_text(layout=False)
+        if page_text:
+            text_parts.append(page_text)
+    return "\n".join(text_parts) + "\n" if text_parts else ""
+
+
+def _extract_tables(pdf):
+    """Return the tables of every page as one flat list."""
+    all_tables = []
+    for page in pdf.pages:
+        tables = page.extract_tables()
+        if tables:
+            all_tables.extend(tables)
+    return all_tables
+
+
+def _derive_fields(full_text, load_tables, debug_mode=False):
+    """
+    Run pre-process → tokenize → NLP scoring → fallbacks → validation on extracted text.
+    load_tables is only called when the amount is not found in the text, since
+    table detection is the most expensive step per page.
+    """
+    # ── Pre-process ──
+    cleaned = preprocess_text(full_text)
+
+    # ── Tokenize ──
+    tokens = tokenize(cleaned, context_window=5)
+
+    # ── NLP Entity Detection ──
+    entity_cands = score_all_entities(tokens)
+    ifsc_cands   = entity_cands["IFSC"]
+    pan_cands    = entity_cands["PAN"]
+    gst_cands    = entity_cands["GST"]
+    acc_cands    = entity_cands["ACCOUNT_NUMBER"]
+    inv_cands    = entity_cands["INVOICE_NUMBER"]
+    date_cands   = entity_cands["DATE"]
+    amt_cands    = entity_cands["AMOUNT"]
+    phone_cands  = entity_cands["PHONE_NUMBER"]
+
+    # ── Pick best per field ──
+    ifsc  = ifsc_cands[0][0].text.upper().strip() if ifsc_cands else ""
+    pan   = pan_cands[0][0].text.upper().strip() if pan_cands else ""
+    gst   = gst_cands[0][0].text.upper().strip() if gst_cands else ""
+
+    # Invoice: NLP → alphanumeric fallback
+    # Sanity: reject NLP pick if it has no real invoice context
+    inv_no = ""
+    if inv_cands:
+        top_tok, top_score = inv_cands[0]
+        candidate = top_tok.text.strip()
+        near_amount = any(
+            cleaned.startswith(candidate, m.end())
+            for m in _AMOUNT_LABEL_PREFIX_RE.finditer(cleaned)
+        )
+        # Strong context (keywords boosted score above 50)
+        if top_score > 50 and not near_amount:
+            inv_no = candidate
+        # Single/double digit: allow if previous line has invoice/bill header
+        elif len(candidate) <= 2 and not near_amount:
+            # Only split as far as the previous line
+            line_idx = top_tok.line_idx
+            prev_line = (cleaned.split("\n", line_idx)[line_idx - 1].lower()
+                         if line_idx > 0 else "")
+            if _INVOICE_LABEL_RE.search(prev_line):
+                inv_no = candidate
+    if not inv_no:
+        inv_no = extract_alphanumeric_invoice(cleaned)
+
+    # Account: skip if same as invoice number
+    acc_no = ""
+    for tok, sc in acc_cands:
+        if tok.text.strip() != inv_no:
+            acc_no = tok.text.strip()
+            break
+
+    # Date: NLP → full-month fallback
+    inv_date = normalize_date(date_cands[0][0].text.strip()) if date_cands else ""
+    if not inv_date:
+        inv_date = extract_full_month_date(cleaned)
+
+    # Amount: NLP → table → bare fallback
+    amount = ""
+    if amt_cands:
+        raw = amt_cands[0][0].text.strip().replace(',', '')
+        amt = _parse_amount(raw)
+        if amt is not None and amt >= 10:
+            amount = raw
+    if not amount:
+        all_tables = load_tables()
+        if all_tables:
+            amount, _ = extract_amount_from_tables(all_tables)
+    if not amount:
+        amount = extract_bare_amount(cleaned)
+
+    # Party name
+    party_name, _ = extract_party_name(cleaned, tokens)
+
+    # Phone: skip if same as account number
+    phone_no = ""
+    for tok, sc in phone_cands:
+        if tok.text.strip() != acc_no:
+            phone_no = tok.text.strip()
+            break
+
+    # ── Bank details fallback (fills gaps NLP missed) ──
+    fallback = parse_bank_details_fallback(cleaned)
+    if not acc_no and fallback.get("account_no"):
+        acc_no = fallback["account_no"]
+    if not ifsc and fallback.get("ifsc"):
+        ifsc = fallback["ifsc"]
+
+    # Bank name: IFSC lookup → fallback parser
+    bank_name = derive_bank_name(ifsc)
+    if not bank_name and fallback.get("bank_name"):
+        bank_name = fallback["bank_name"]
+
+    # PAN preferred over GST
+    pan_gst = pan if pan else gst
+
+    record = {
+        "Party name": party_name,
+        "Invoice Date": inv_date,
+        "Invoice No.": inv_no,
+        "Amount": amount,
+        "Phone Number": phone_no,
+        "Bank Name": bank_name,
+        "Bank Account No": acc_no,
+        "IFSC Code": ifsc,
+        "PAN Number / GST": pan_gst,
+    }
+
+    warnings = validate_extraction(record)
+
+    debug_info = ""
+    if debug_mode:
+        debug_info = (
+            f"--- IFSC candidates:  {[(t.text, s) for t, s in ifsc_cands]}\n"
+            f"--- PAN  candidates:  {[(t.text, s) for t, s in pan_cands]}\n"
+            f"--- GST  candidates:  {[(t.text, s) for t, s in gst_cands]}\n"
+            f"--- Acc  candidates:  {[(t.text, s) for t, s in acc_cands]}\n"
+            f"--- Inv  candidates:  {[(t.text, s) for t, s in inv_cands]}\n"
+            f"--- Date candidates:  {[(t.text, s) for t, s in date_cands]}\n"
+            f"--- Amt  candidates:  {[(t.text, s) for t, s in amt_cands]}\n"
+            f"--- Phone candidates: {[(t.text, s) for t, s in phone_cands]}\n"
+            f"--- Alphanumeric inv: '{extract_alphanumeric_invoice(cleaned)}'\n"
+            f"--- Full-month date:  '{extract_full_month_date(cleaned)}'\n"
+            f"--- Bare amount:      '{extract_bare_amount(cleaned)}'\n"
+            f"--- Bank fallback:    {fallback}\n"
+            f"--- Warnings:         {warnings}\n"
+            f"\n--- RAW TEXT (first 3000 chars) ---\n{full_text[:3000]}"
+        )
+
+    return record, warnings, debug_info
+
+
 def extract_invoice_data(pdf_file, debug_mode=False):
-    try:
-        with pdfplumber.open(pdf_file) as pdf:
-            full_text = ""
-            all_tables = []
-
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    full_text += page_text + "\n"
-                tables = page.extract_tables()
-                if tables:
-                    all_tables.extend(tables)
-
-            if not full_text.strip():
-                return None, ["No text extracted — PDF may be scanned/image-based"], "", ""
-
-            # ── Pre-process ──
-            cleaned = preprocess_text(full_text)
-
-            # ── Tokenize ──
-            tokens = tokenize(cleaned, context_window=5)
-
-            # ── NLP Entity Detection ──
-            ifsc_cands   = find_entity(tokens, "IFSC")
-            pan_cands    = find_entity(tokens, "PAN")
-            gst_cands    = find_entity(tokens, "GST")
-            acc_cands    = find_entity(tokens, "ACCOUNT_NUMBER")
-            inv_cands    = find_entity(tokens, "INVOICE_NUMBER")
-            date_cands   = find_entity(tokens, "DATE")
-            amt_cands    = find_entity(tokens, "AMOUNT")
-            phone_cands  = find_entity(tokens, "PHONE_NUMBER")
-
-            # ── Pick best per field ──
-            ifsc  = ifsc_cands[0][0].text.upper().strip() if ifsc_cands else ""
-            pan   = pan_cands[0][0].text.upper().strip() if pan_cands else ""
-            gst   = gst_cands[0][0].text.upper().strip() if gst_cands else ""
-
-            # Invoice: NLP → alphanumeric fallback
-            # Sanity: reject NLP pick if it has no real invoice context
-            inv_no = ""
-            if inv_cands:
-                top_tok, top_score = inv_cands[0]
-                candidate = top_tok.text.strip()
-                near_amount = re.search(
-                    r'(?:total|amount|grand|net|balance)\s*[:\-]?\s*' + re.escape(candidate),
-                    cleaned, re.IGNORECASE
-                )
-                # Strong context (keywords boosted score above 50)
-                if top_score > 50 and not near_amount:
-                    inv_no = candidate
-                # Single/double digit: allow if previous line has invoice/bill header
-                elif len(candidate) <= 2 and not near_amount:
-                    lines = cleaned.split("\n")
-                    line_idx = top_tok.line_idx
-                    prev_line = lines[line_idx - 1].lower() if line_idx > 0 else ""
-                    if re.search(r'invoice|bill\s+no|inv\s+no', prev_line):
-                        inv_no = candidate
-            if not inv_no:
-                inv_no = extract_alphanumeric_invoice(cleaned)
-
-            # Account: skip if same as invoice number
-            acc_no = ""
-            for tok, sc in acc_cands:
-                if tok.text.strip() != inv_no:
-                    acc_no = tok.text.strip()
-                    break
+    """Extract one invoice's record.  Errors propagate; the UI reports them per file."""
+    with pdfplumber.open(pdf_file) as pdf:
+        full_text = _extract_text(pdf)
 
-            # Date: NLP → full-month fallback
-            inv_date = normalize_date(date_cands[0][0].text.strip()) if date_cands else ""
-            if not inv_date:
-                inv_date = extract_full_month_date(cleaned)
+        if not full_text.strip():
+            return None, ["No text extracted — PDF may be scanned/image-based"], "", ""
 
-            # Amount: NLP → table → bare fallback
-            amount = ""
-            if amt_cands:
-                raw = amt_cands[0][0].text.strip().replace(',', '')
-                try:
-                    if float(raw) >= 10:
-                        amount = raw
-                except ValueError:
-                    pass
-            if not amount and all_tables:
-                amount, _ = extract_amount_from_tables(all_tables)
-            if not amount:
-                amount = extract_bare_amount(cleaned)
-
-            # Party name
-            party_name, _ = extract_party_name(cleaned, tokens)
-
-            # Phone: skip if same as account number
-            phone_no = ""
-            for tok, sc in phone_cands:
-                if tok.text.strip() != acc_no:
-                    phone_no = tok.text.strip()
-                    break
+        record, warnings, debug_info = _derive_fields(
+            full_text, lambda: _extract_tables(pdf), debug_mode
+        )
+    return record, warnings, debug_info, full_text
 
-            # ── Bank details fallback (fills gaps NLP missed) ──
-            fallback = parse_bank_details_fallback(cleaned)
-            if not acc_no and fallback.get("account_no"):
-                acc_no = fallback["account_no"]
-            if not ifsc and fallback.get("ifsc"):
-                ifsc = fallback["ifsc"]
-
-            # Bank name: IFSC lookup → fallback parser
-            bank_name = derive_bank_name(ifsc)
-            if not bank_name and fallback.get("bank_name"):
-                bank_name = fallback["bank_name"]
-
-            # PAN preferred over GST
-            pan_gst = pan if pan else gst
-
-            record = {
-                "Party name": party_name,
-                "Invoice Date": inv_date,
-                "Invoice No.": inv_no,
-                "Amount": amount,
-                "Phone Number": phone_no,
-                "Bank Name": bank_name,
-                "Bank Account No": acc_no,
-                "IFSC Code": ifsc,
-                "PAN Number / GST": pan_gst,
-            }
-
-            warnings = validate_extraction(record)
-
-            debug_info = ""
-            if debug_mode:
-                debug_info = (
-                    f"--- IFSC candidates:  {[(t.text, s) for t, s in ifsc_cands]}\n"
-                    f"--- PAN  candidates:  {[(t.text, s) for t, s in pan_cands]}\n"
-                    f"--- GST  candidates:  {[(t.text, s) for t, s in gst_cands]}\n"
-                    f"--- Acc  candidates:  {[(t.text, s) for t, s in acc_cands]}\n"
-                    f"--- Inv  candidates:  {[(t.text, s) for t, s in inv_cands]}\n"
-                    f"--- Date candidates:  {[(t.text, s) for t, s in date_cands]}\n"
-                    f"--- Amt  candidates:  {[(t.text, s) for t, s in amt_cands]}\n"
-                    f"--- Phone candidates: {[(t.text, s) for t, s in phone_cands]}\n"
-                    f"--- Alphanumeric inv: '{extract_alphanumeric_invoice(cleaned)}'\n"
-                    f"--- Full-month date:  '{extract_full_month_date(cleaned)}'\n"
-                    f"--- Bare amount:      '{extract_bare_amount(cleaned)}'\n"
-                    f"--- Bank fallback:    {fallback}\n"
-                    f"--- Warnings:         {warnings}\n"
-                    f"\n--- RAW TEXT (first 3000 chars) ---\n{full_text[:3000]}"
-                )
 
-            return record, warnings, debug_info, full_text
+@st.cache_data(show_spinner=False, max_entries=256)
+def extract_invoice_data_cached(pdf_bytes, debug_mode=False):
+    """
+    Content-addressed wrapper around extract_invoice_data.  Streamlit hashes
+    pdf_bytes, so re-running an unchanged batch (e.g. after toggling the UI)
+    skips PDF parsing and scoring entirely.
 
-    except Exception as e:
-        import traceback
-        return None, [f"Error: {str(e)}\n{traceback.format_exc()}"], "", ""
+    Errors are raised rather than returned: st.cache_data does not store
+    exceptions, so a file that failed is retried on the next run.
+    """
+    return extract_invoice_data(BytesIO(pdf_bytes), debug_mode)
 
 
 # ─────────────────────────────────────────────
 # 12. STREAMLIT UI
 # ─────────────────────────────────────────────
 
+# Excel column order; also the keys of every extracted record
+OUTPUT_COLUMNS = (
+    "Party name", "Invoice Date", "Invoice No.", "Amount",
+    "Phone Number", "Bank Name", "Bank Account No", "IFSC Code",
+    "PAN Number / GST",
+)
+
+
 def main():
     st.set_page_config(page_title="Invoice PDF → Excel Converter", layout="wide")
     st.title("📄 Invoice PDF → Excel Converter")
@@ -1046,18 +1336,30 @@ def main():
 
     if st.button("🔄 Process Invoices", type="primary"):
         with st.spinner("Processing invoices..."):
-            all_data = []
+            # Column-wise so the DataFrame is built straight from lists
+            all_data = {col: [] for col in OUTPUT_COLUMNS}
+            record_count = 0
             all_warnings = {}
             all_raw_texts = {}
             failed_files = []
 
             progress_bar = st.progress(0)
             status_text = st.empty()
+            file_count = len(uploaded_files)
+            # Each progress update is a frontend message; redraw 50 times at most
+            progress_step = max(1, -(-file_count // 50))
 
             for idx, pdf_file in enumerate(uploaded_files):
                 status_text.text(f"Processing: {pdf_file.name}")
 
-                record, warnings, debug_info, raw_text = extract_invoice_data(pdf_file, debug_mode)
+                try:
+                    record, warnings, debug_info, raw_text = extract_invoice_data_cached(
+                        pdf_file.getvalue(), debug_mode
+                    )
+                except Exception as e:
+                    import traceback
+                    record, debug_info, raw_text = None, "", ""
+                    warnings = [f"Error: {str(e)}\n{traceback.format_exc()}"]
 
                 if debug_mode and debug_info:
                     with st.expander(f"🔍 Debug — {pdf_file.name}"):
@@ -1065,7 +1367,9 @@ def main():
                                      key=f"debug_{idx}")
 
                 if record:
-                    all_data.append(record)
+                    for col in OUTPUT_COLUMNS:
+                        all_data[col].append(record[col])
+                    record_count += 1
                     if warnings:
                         all_warnings[pdf_file.name] = warnings
                     if raw_text:
@@ -1075,7 +1379,9 @@ def main():
                     if warnings:
                         st.warning(f"⚠️ {pdf_file.name}: {'; '.join(warnings)}")
 
-                progress_bar.progress((idx + 1) / len(uploaded_files))
+                done = idx + 1
+                if done % progress_step == 0 or done == file_count:
+                    progress_bar.progress(done / file_count)
 
             status_text.empty()
 
@@ -1086,15 +1392,10 @@ def main():
                         for w in warns:
                             st.markdown(f"  - ⚠️ {w}")
 
-            if all_data:
-                columns = [
-                    "Party name", "Invoice Date", "Invoice No.", "Amount",
-                    "Phone Number", "Bank Name", "Bank Account No", "IFSC Code",
-                    "PAN Number / GST"
-                ]
-                df = pd.DataFrame(all_data, columns=columns)
+            if record_count:
+                df = pd.DataFrame(all_data, columns=list(OUTPUT_COLUMNS))
 
-                st.success(f"✅ Successfully processed {len(all_data)} invoice(s)")
+                st.success(f"✅ Successfully processed {record_count} invoice(s)")
                 if failed_files:
                     st.warning(f"⚠️ Failed: {', '.join(failed_files)}")
 
@@ -1103,23 +1404,21 @@ def main():
 
                 # Excel export
                 output = BytesIO()
-                with pd.ExcelWriter(output, engine='openpyxl') as writer:
+                with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
                     df.to_excel(writer, index=False, sheet_name='Invoices')
                     ws = writer.sheets['Invoices']
-                    for col_idx, col_name in enumerate(columns):
-                        max_len = max(
-                            df[col_name].astype(str).apply(len).max(),
-                            len(col_name)
-                        ) + 2
-                        ws.column_dimensions[chr(65 + col_idx)].width = min(max_len, 50)
+                    col_lens = df.astype(str).map(len).max()
+                    for col_idx, col_name in enumerate(OUTPUT_COLUMNS):
+                        max_len = max(col_lens[col_name], len(col_name)) + 2
+                        ws.set_column(col_idx, col_idx, min(max_len, 50))
 
                     if all_warnings:
                         warn_rows = [{"File": f, "Warning": w}
                                      for f, ws_list in all_warnings.items() for w in ws_list]
                         pd.DataFrame(warn_rows).to_excel(writer, index=False, sheet_name='Warnings')
                         ws2 = writer.sheets['Warnings']
-                        ws2.column_dimensions['A'].width = 35
-                        ws2.column_dimensions['B'].width = 60
+                        ws2.set_column(0, 0, 35)
+                        ws2.set_column(1, 1, 60)
 
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                 st.download_button(
@@ -1132,9 +1431,10 @@ def main():
 
                 # Debug text download if there were warnings
                 if all_warnings and all_raw_texts:
-                    debug_txt = ""
-                    for fname, raw in all_raw_texts.items():
-                        debug_txt += f"{'='*60}\nFILE: {fname}\n{'='*60}\n{raw}\n\n"
+                    debug_txt = "".join(
+                        f"{'='*60}\nFILE: {fname}\n{'='*60}\n{raw}\n\n"
+                        for fname, raw in all_raw_texts.items()
+                    )
                     st.download_button(
                         label="⬇️ Download Debug Text (for troubleshooting)",
                         data=debug_txt,